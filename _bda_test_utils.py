@@ -0,0 +1,84 @@
+"""
+Shared helpers for the BDA test scripts
+"""
+
+import itertools
+import os
+import time
+from contextlib import contextmanager
+
+from boto3.s3.transfer import TransferConfig
+
+# Safety net for anything the explicit teardown cannot remove
+LIFECYCLE_EXPIRY_RULE = {'ID': 'auto-expire', 'Status': 'Enabled', 'Expiration': {'Days': 1}, 'Filter': {'Prefix': ''}}
+
+# delete_objects accepts at most this many keys per call
+DELETE_BATCH_SIZE = 1000
+
+# Fixtures this large are uploaded in parallel parts by the transfer manager
+MULTIPART_THRESHOLD_BYTES = 8 * 1024 * 1024
+_TRANSFER_CONFIG = TransferConfig(multipart_threshold=MULTIPART_THRESHOLD_BYTES, max_concurrency=10, use_threads=True)
+
+# Read the clock once; later names take the next value, so buckets made in the same
+# second by one process still get distinct names
+_bucket_suffixes = itertools.count(time.time_ns())
+
+def _bucket_name(prefix: str) -> str:
+    return f"{prefix}-{next(_bucket_suffixes):x}"
+
+@contextmanager
+def ephemeral_bucket(s3_client, prefix: str, region: str = 'us-east-1'):
+    """Create a throwaway bucket and always remove it on exit
+
+    Yields (bucket_name, keys); upload_fixture records its keys there. Teardown lists the
+    whole bucket, so BDA's output objects go too, and deletes it in batched delete_objects
+    calls before deleting the bucket.
+    """
+    bucket_name = _bucket_name(prefix)
+    if region == 'us-east-1':
+        s3_client.create_bucket(Bucket=bucket_name)
+    else:
+        s3_client.create_bucket(Bucket=bucket_name, CreateBucketConfiguration={'LocationConstraint': region})
+
+    # BDA writes its output after the script has moved on, and a failed teardown leaves the
+    # objects behind; either way they expire within a day instead of lingering
+    try:
+        s3_client.put_bucket_lifecycle_configuration(
+            Bucket=bucket_name,
+            LifecycleConfiguration={'Rules': [LIFECYCLE_EXPIRY_RULE]}
+        )
+    except Exception as e:
+        print(f"⚠️ Could not set expiry on test bucket {bucket_name}: {e}")
+
+    keys = []
+    try:
+        yield bucket_name, keys
+    finally:
+        try:
+            _empty_bucket(s3_client, bucket_name)
+            s3_client.delete_bucket(Bucket=bucket_name)
+        except Exception as e:
+            print(f"⚠️ Could not remove test bucket {bucket_name}: {e}")
+
+def _empty_bucket(s3_client, bucket_name: str):
+    """Delete every object in the bucket, DELETE_BATCH_SIZE keys per delete_objects call"""
+    paginator = s3_client.get_paginator('list_objects_v2')
+    for page in paginator.paginate(Bucket=bucket_name, PaginationConfig={'PageSize': DELETE_BATCH_SIZE}):
+        objects = [{'Key': obj['Key']} for obj in page.get('Contents', [])]
+        if objects:
+            s3_client.delete_objects(Bucket=bucket_name, Delete={'Objects': objects, 'Quiet': True})
+
+def upload_fixture(s3_client, bucket_name: str, keys: list, key: str, source, content_type: str):
+    """Upload bytes or a local file path to the test bucket and record the key in keys
+
+    Small fixtures go up in one put_object; files at or above the multipart threshold go
+    through the transfer manager so their parts upload in parallel.
+    """
+    if isinstance(source, bytes):
+        s3_client.put_object(Bucket=bucket_name, Key=key, Body=source, ContentType=content_type)
+    elif os.path.getsize(source) < MULTIPART_THRESHOLD_BYTES:
+        with open(source, 'rb') as f:
+            s3_client.put_object(Bucket=bucket_name, Key=key, Body=f, ContentType=content_type)
+    else:
+        s3_client.upload_file(source, bucket_name, key, ExtraArgs={'ContentType': content_type}, Config=_TRANSFER_CONFIG)
+    keys.append(key)
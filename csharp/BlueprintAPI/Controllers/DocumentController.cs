@@ -160,7 +160,7 @@ namespace BlueprintAPI.Controllers
         }
 
         [HttpGet("blueprint/projects")]
-        public async Task<IActionResult> ListBlueprintProjects()
+        public async Task<IActionResult> ListBlueprintProjects([FromQuery] string? service = null)
         {
             try
             {
@@ -168,11 +168,21 @@ namespace BlueprintAPI.Controllers
                 
                 var projects = await _blueprintProcessor.ListBlueprintProjectsAsync();
                 
+                // ?service=bda keeps only real BDA projects, newest first, so clients can take the first one
+                if (string.Equals(service, "bda", StringComparison.OrdinalIgnoreCase))
+                {
+                    projects = projects
+                        .Where(p => p.ProcessingMode == "BDA" && p.ProjectArn.Contains(":data-automation-project/"))
+                        .OrderByDescending(p => p.CreatedAt)
+                        .ToList();
+                }
+                
                 return Ok(new
                 {
                     Status = "success",
                     Projects = projects,
                     Count = projects.Count,
+                    Filter = service,
                     Message = $"Found {projects.Count} C# Blueprint projects in your AWS account",
                     Language = "C#"
                 });
@@ -2,10 +2,19 @@
 FastAPI application for Blueprint-based document processing
 """
 from fastapi import FastAPI, File, UploadFile, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi.concurrency import run_in_threadpool
+try:
+    import orjson  # noqa: F401 - ORJSONResponse serializes with orjson
+    from fastapi.responses import ORJSONResponse as JSONResponse
+except ImportError:
+    from fastapi.responses import JSONResponse
+import logging
 import sys
 import os
 
+# Processor modules log through the stdlib logging module; surface them on stdout
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO").upper(), format="%(message)s")
+
 # Add shared utilities to path
 shared_path = os.path.join(os.path.dirname(__file__), '..', '..', '..', 'shared')
 sys.path.append(shared_path)
@@ -29,7 +38,7 @@ print("🔥🔥🔥 FASTAPI STARTING - UPDATED CODE VERSION 3.0 - DEC 14, 2025 
 print("🚀 This is the LATEST API code with debugging!")
 print("=" * 80)
 
-app = FastAPI(title="Blueprint API Document Processor", version="3.0.0")
+app = FastAPI(title="Blueprint API Document Processor", version="3.0.0", default_response_class=JSONResponse)
 
 print("📡 Creating BlueprintProcessor instance...")
 processor = BlueprintProcessor()
@@ -135,7 +144,7 @@ async def process_w2(file: UploadFile = File(...)):
         
         # Process document with Blueprint
         print("🚀 Sending to BlueprintProcessor...")
-        result = processor.process_document(content, 'w2')
+        result = await run_in_threadpool(processor.process_document, content, 'w2')
         
         return JSONResponse(content={
             "status": "success",
@@ -163,7 +172,7 @@ async def process_bank_statement(file: UploadFile = File(...)):
             raise HTTPException(status_code=400, detail="Only PDF and image files are supported")
         
         # Process document with Blueprint
-        result = processor.process_document(content, 'bank_statement')
+        result = await run_in_threadpool(processor.process_document, content, 'bank_statement')
         
         return JSONResponse(content={
             "status": "success",
@@ -264,7 +273,7 @@ async def get_project_fields(project_name: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/blueprint/project/{project_name}/upload")
-async def upload_document_to_project(project_name: str, file: UploadFile = File(...)):
+async def upload_document_to_project(project_name: str, file: UploadFile = File(...), wait: bool = False):
     """Upload a document to a Blueprint project for training or processing - stores in AWS S3"""
     try:
         print(f"📤 Uploading document to Blueprint project: {project_name}")
@@ -279,7 +288,8 @@ async def upload_document_to_project(project_name: str, file: UploadFile = File(
         result = await processor.upload_document_to_project(
             project_name=project_name,
             document_bytes=content,
-            filename=file.filename
+            filename=file.filename,
+            wait_for_results=wait
         )
         
         return JSONResponse(content={
@@ -290,6 +300,8 @@ async def upload_document_to_project(project_name: str, file: UploadFile = File(
             "document_key": result.get("document_key"),
             "upload_timestamp": result.get("upload_timestamp"),
             "invocation_arn": result.get("invocation_arn"),
+            "output_s3_uri": result.get("output_s3_uri"),
+            "processing_status": result.get("status"),
             "service": result.get("service"),
             "message": f"Document uploaded to Blueprint project '{project_name}' in your AWS account"
         })
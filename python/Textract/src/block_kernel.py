@@ -0,0 +1,124 @@
+"""
+Columnar Textract block traversal kernel
+
+Blocks are converted once from a list of dicts into parallel lists with
+relationship ids resolved to integer positions, so the key/value and table
+walks below index plain lists instead of hashing block ids and probing dicts.
+"""
+from typing import Dict, List, NamedTuple, Optional
+
+
+class BlockColumns(NamedTuple):
+    """Textract blocks laid out column-wise; every list is indexed by block position"""
+    types: List[str]
+    word_texts: List[Optional[str]]   # Text for WORD blocks, None otherwise
+    child_rows: List[List[int]]       # positions of CHILD blocks that exist in the response
+    value_rows: List[List[int]]       # positions of VALUE blocks that exist in the response
+    row_indexes: List[int]            # CELL RowIndex, 0 for other blocks
+    column_indexes: List[int]         # CELL ColumnIndex, 0 for other blocks
+    key_rows: List[int]               # positions of KEY_VALUE_SET blocks tagged KEY
+    table_rows: List[int]             # positions of TABLE blocks
+    confidences: List[float]
+
+
+def index_blocks(blocks: List[Dict]) -> BlockColumns:
+    """Convert Textract blocks into columns with relationships resolved to positions"""
+    position_by_id = {}
+    for i in range(len(blocks)):
+        position_by_id[blocks[i]['Id']] = i
+    get_position = position_by_id.get
+
+    types = []
+    word_texts = []
+    child_rows = []
+    value_rows = []
+    row_indexes = []
+    column_indexes = []
+    key_rows = []
+    table_rows = []
+    confidences = []
+
+    for i in range(len(blocks)):
+        block = blocks[i]
+        block_type = block['BlockType']
+        types.append(block_type)
+        word_texts.append(block.get('Text') if block_type == 'WORD' else None)
+        row_indexes.append(block.get('RowIndex', 0))
+        column_indexes.append(block.get('ColumnIndex', 0))
+
+        children = []
+        values = []
+        for relationship in block.get('Relationships', ()):
+            relationship_type = relationship['Type']
+            if relationship_type == 'CHILD':
+                target = children
+            elif relationship_type == 'VALUE':
+                target = values
+            else:
+                continue
+            for related_id in relationship['Ids']:
+                position = get_position(related_id)
+                if position is not None:
+                    target.append(position)
+        child_rows.append(children)
+        value_rows.append(values)
+
+        if block_type == 'KEY_VALUE_SET':
+            if 'KEY' in block.get('EntityTypes', ()):
+                key_rows.append(i)
+        elif block_type == 'TABLE':
+            table_rows.append(i)
+
+        confidence = block.get('Confidence')
+        if confidence is not None:
+            confidences.append(confidence)
+
+    return BlockColumns(types, word_texts, child_rows, value_rows, row_indexes,
+                        column_indexes, key_rows, table_rows, confidences)
+
+
+def block_text(columns: BlockColumns, position: int) -> str:
+    """Join the text of a block's WORD children"""
+    word_texts = columns.word_texts
+    text_parts = []
+    for child in columns.child_rows[position]:
+        text = word_texts[child]
+        if text is not None:
+            text_parts.append(text)
+    return ' '.join(text_parts)
+
+
+def extract_key_value_pairs(columns: BlockColumns) -> Dict[str, str]:
+    """Extract key-value pairs from the KEY blocks"""
+    value_rows = columns.value_rows
+    key_value_pairs = {}
+
+    for position in columns.key_rows:
+        key_text = block_text(columns, position)
+        values = value_rows[position]
+        value_text = block_text(columns, values[0]) if values else ''
+        if key_text and value_text:
+            key_value_pairs[key_text] = value_text
+
+    return key_value_pairs
+
+
+def extract_tables(columns: BlockColumns) -> List[Dict]:
+    """Build each table's rows of cell text, ordered by row and column index"""
+    types = columns.types
+    child_rows = columns.child_rows
+    row_indexes = columns.row_indexes
+    column_indexes = columns.column_indexes
+    tables = []
+
+    for position in columns.table_rows:
+        rows = {}
+        for cell in child_rows[position]:
+            if types[cell] == 'CELL':
+                row = rows.setdefault(row_indexes[cell], {})
+                row[column_indexes[cell]] = block_text(columns, cell)
+        tables.append({
+            'rows': [[row[column] for column in sorted(row)] for _, row in sorted(rows.items())]
+        })
+
+    return tables
@@ -5,10 +5,16 @@ Simulates Lambda execution in a local FastAPI server
 """
 
 from fastapi import FastAPI, File, UploadFile, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi.concurrency import run_in_threadpool
+try:
+    import orjson  # noqa: F401 - ORJSONResponse serializes with orjson
+    from fastapi.responses import ORJSONResponse as JSONResponse
+except ImportError:
+    from fastapi.responses import JSONResponse
 import sys
 import os
 import json
+import uuid
 
 # Add shared utilities to path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', '..', 'shared'))
@@ -29,16 +35,38 @@ except ImportError:
                 "status": "placeholder"
             }
 
-app = FastAPI(title="Textract Local Development Server", version="1.0.0")
+app = FastAPI(title="Textract Local Development Server", version="1.0.0", default_response_class=JSONResponse)
 
 processor = TextractProcessor()
 
+# Uploads above the threshold are streamed to this bucket and analyzed asynchronously
+# instead of being read into memory; without a bucket every upload is processed inline
+STAGING_BUCKET = os.getenv("TEXTRACT_STAGING_BUCKET")
+STREAMING_UPLOAD_THRESHOLD_BYTES = 5 * 1024 * 1024
+
+def _upload_size(file: UploadFile) -> int:
+    """Size of the spooled upload; UploadFile.size only exists on newer Starlette releases"""
+    stream = file.file
+    position = stream.tell()
+    size = stream.seek(0, os.SEEK_END)
+    stream.seek(position)
+    return size
+
+def _process_upload(file: UploadFile, doc_type: str):
+    """Process an upload from its spooled file, staging large ones in S3; runs in a worker thread"""
+    if STAGING_BUCKET and _upload_size(file) > STREAMING_UPLOAD_THRESHOLD_BYTES:
+        key = f"uploads/{uuid.uuid4().hex}_{file.filename}"
+        processor.s3_client.upload_fileobj(file.file, STAGING_BUCKET, key)
+        job_id = processor.process_document_async(STAGING_BUCKET, key, doc_type)
+        return {"status": "IN_PROGRESS", "job_id": job_id, "document_type": doc_type}
+    
+    return processor.process_document_sync(file.file.read(), doc_type)
+
 @app.post("/process/w2")
 async def process_w2_local(file: UploadFile = File(...)):
     """Process W-2 document locally"""
     try:
-        content = await file.read()
-        result = processor.process_document_sync(content, 'w2')
+        result = await run_in_threadpool(_process_upload, file, 'w2')
         
         return JSONResponse(content={
             "status": "success",
@@ -55,8 +83,7 @@ async def process_w2_local(file: UploadFile = File(...)):
 async def process_bank_statement_local(file: UploadFile = File(...)):
     """Process bank statement locally"""
     try:
-        content = await file.read()
-        result = processor.process_document_sync(content, 'bank_statement')
+        result = await run_in_threadpool(_process_upload, file, 'bank_statement')
         
         return JSONResponse(content={
             "status": "success", 
@@ -69,6 +96,16 @@ async def process_bank_statement_local(file: UploadFile = File(...)):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/results/{job_id}")
+async def get_results_local(job_id: str, doc_type: str = 'w2'):
+    """Fetch the results of a large upload that was processed asynchronously"""
+    try:
+        result = await run_in_threadpool(processor.get_async_results, job_id, doc_type)
+        return {"status": "success", "job_id": job_id, "extracted_data": result}
+        
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
@@ -82,6 +119,7 @@ async def root():
         "endpoints": [
             "POST /process/w2",
             "POST /process/bank-statement", 
+            "GET /results/{job_id}",
             "GET /health"
         ],
         "mode": "local_development"
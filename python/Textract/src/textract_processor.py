@@ -2,28 +2,71 @@
 Direct AWS Textract processor for document analysis
 """
 import boto3
-import json
+import re
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, List, Optional
+from botocore.config import Config
 from botocore.exceptions import ClientError
 
+from block_kernel import extract_key_value_pairs, extract_tables, index_blocks
+
+try:
+    import numpy as np  # Optional vectorized reductions for confidence scores
+except ImportError:
+    np = None
+
+# Shared by both clients: a connection pool large enough for concurrent request
+# handlers, TCP keep-alive, and adaptive client-side backoff under throttling
+_CLIENT_CONFIG = Config(
+    max_pool_connections=64,
+    tcp_keepalive=True,
+    retries={'mode': 'adaptive', 'max_attempts': 5}
+)
+
+# Textract form key substrings -> W-2 field, in priority order: a key containing
+# several of them maps to the earliest listed, whatever its position in the key.
+# Compiled once into zero-width lookaheads so one scan finds every alias, even overlapping ones
+W2_FIELD_MAPPINGS = {
+    'Employee\'s social security number': 'employee_ssn',
+    'Employee\'s name': 'employee_name',
+    'Employer identification number': 'employer_ein',
+    'Employer\'s name': 'employer_name',
+    'Wages, tips, other compensation': 'wages',
+    'Federal income tax withheld': 'federal_tax_withheld'
+}
+_W2_FIELD_PATTERN = re.compile('|'.join(
+    f'(?=(?P<{field_name}>{re.escape(mapping_key.lower())}))' for mapping_key, field_name in W2_FIELD_MAPPINGS.items()
+))
+_W2_FIELD_PRIORITY = {field_name: i for i, field_name in enumerate(W2_FIELD_MAPPINGS.values())}
+
+# Runs the text and forms/tables requests for one document side by side
+_EXECUTOR = ThreadPoolExecutor(max_workers=16, thread_name_prefix='textract')
+
 class TextractProcessor:
     def __init__(self, region_name: str = 'us-east-1'):
-        self.textract_client = boto3.client('textract', region_name=region_name)
-        self.s3_client = boto3.client('s3', region_name=region_name)
+        # Created once and reused for every request; boto3 clients are thread-safe for API calls
+        self.textract_client = boto3.client('textract', region_name=region_name, config=_CLIENT_CONFIG)
+        self.s3_client = boto3.client('s3', region_name=region_name, config=_CLIENT_CONFIG)
     
     def process_document_sync(self, document_bytes: bytes, doc_type: str) -> Dict[str, Any]:
         """Process document synchronously using Textract"""
         try:
-            response = self.textract_client.detect_document_text(
+            # Issue both Textract calls concurrently so their round-trips overlap
+            text_future = _EXECUTOR.submit(
+                self.textract_client.detect_document_text,
                 Document={'Bytes': document_bytes}
             )
             
             # Also get forms and tables
-            forms_response = self.textract_client.analyze_document(
+            forms_future = _EXECUTOR.submit(
+                self.textract_client.analyze_document,
                 Document={'Bytes': document_bytes},
                 FeatureTypes=['FORMS', 'TABLES']
             )
             
+            response = text_future.result()
+            forms_response = forms_future.result()
+            
             return self._parse_textract_response(response, forms_response, doc_type)
             
         except ClientError as e:
@@ -53,6 +96,14 @@ class TextractProcessor:
             response = self.textract_client.get_document_analysis(JobId=job_id)
             
             if response['JobStatus'] == 'SUCCEEDED':
+                # Multi-page results come back in pages; gather every block before parsing
+                blocks = list(response.get('Blocks', []))
+                next_token = response.get('NextToken')
+                while next_token:
+                    page = self.textract_client.get_document_analysis(JobId=job_id, NextToken=next_token)
+                    blocks.extend(page.get('Blocks', []))
+                    next_token = page.get('NextToken')
+                response['Blocks'] = blocks
                 return self._parse_textract_response(None, response, doc_type)
             elif response['JobStatus'] == 'FAILED':
                 raise Exception(f"Textract job failed: {response.get('StatusMessage', 'Unknown error')}")
@@ -87,29 +138,20 @@ class TextractProcessor:
             'medicare_wages': None
         }
         
-        blocks = forms_response.get('Blocks', [])
-        key_value_pairs = self._extract_key_value_pairs(blocks)
+        columns = index_blocks(forms_response.get('Blocks', []))
+        key_value_pairs = extract_key_value_pairs(columns)
         
         # Map Textract fields to W-2 fields
-        field_mappings = {
-            'Employee\'s social security number': 'employee_ssn',
-            'Employee\'s name': 'employee_name',
-            'Employer identification number': 'employer_ein',
-            'Employer\'s name': 'employer_name',
-            'Wages, tips, other compensation': 'wages',
-            'Federal income tax withheld': 'federal_tax_withheld'
-        }
-        
+        find_fields = _W2_FIELD_PATTERN.finditer
         for key, value in key_value_pairs.items():
-            for mapping_key, field_name in field_mappings.items():
-                if mapping_key.lower() in key.lower():
-                    w2_fields[field_name] = value
-                    break
+            field_names = [match.lastgroup for match in find_fields(key.lower())]
+            if field_names:
+                w2_fields[min(field_names, key=_W2_FIELD_PRIORITY.__getitem__)] = value
         
         return {
             'document_type': 'w2',
             'extracted_fields': w2_fields,
-            'confidence_scores': self._calculate_confidence_scores(blocks),
+            'confidence_scores': self._calculate_confidence_scores(columns.confidences),
             'raw_key_value_pairs': key_value_pairs
         }
     
@@ -125,69 +167,50 @@ class TextractProcessor:
             'transactions': []
         }
         
-        blocks = forms_response.get('Blocks', [])
+        columns = index_blocks(forms_response.get('Blocks', []))
         
         # Extract tables (transactions)
-        tables = self._extract_tables(blocks)
+        tables = extract_tables(columns)
         statement_data['transactions'] = self._parse_transaction_tables(tables)
         
         # Extract key information
-        key_value_pairs = self._extract_key_value_pairs(blocks)
+        key_value_pairs = extract_key_value_pairs(columns)
         
         return {
             'document_type': 'bank_statement',
             'extracted_fields': statement_data,
-            'confidence_scores': self._calculate_confidence_scores(blocks),
+            'confidence_scores': self._calculate_confidence_scores(columns.confidences),
             'raw_key_value_pairs': key_value_pairs
         }
     
-    def _extract_key_value_pairs(self, blocks: List[Dict]) -> Dict[str, str]:
-        """Extract key-value pairs from Textract blocks"""
-        key_value_pairs = {}
-        
-        for block in blocks:
-            if block['BlockType'] == 'KEY_VALUE_SET':
-                if 'KEY' in block.get('EntityTypes', []):
-                    # This is a key block
-                    key_text = self._get_text_from_relationships(block, blocks)
-                    value_text = self._get_value_from_key_block(block, blocks)
-                    if key_text and value_text:
-                        key_value_pairs[key_text] = value_text
-        
-        return key_value_pairs
-    
-    def _extract_tables(self, blocks: List[Dict]) -> List[Dict]:
-        """Extract table data from Textract blocks"""
-        tables = []
-        
-        for block in blocks:
-            if block['BlockType'] == 'TABLE':
-                table_data = self._parse_table_block(block, blocks)
-                tables.append(table_data)
-        
-        return tables
-    
-    def _get_text_from_relationships(self, block: Dict, all_blocks: List[Dict]) -> str:
-        """Get text content from block relationships"""
-        text_parts = []
-        
-        if 'Relationships' in block:
-            for relationship in block['Relationships']:
-                if relationship['Type'] == 'CHILD':
-                    for child_id in relationship['Ids']:
-                        child_block = next((b for b in all_blocks if b['Id'] == child_id), None)
-                        if child_block and child_block['BlockType'] == 'WORD':
-                            text_parts.append(child_block['Text'])
+    def _parse_transaction_tables(self, tables: List[Dict]) -> List[Dict]:
+        """Turn each table from block_kernel.extract_tables into transactions keyed by its header row"""
+        transactions = []
+        
+        for table in tables:
+            rows = table['rows']
+            if len(rows) < 2:
+                continue
+            
+            header = [cell.strip().lower() for cell in rows[0]]
+            for row in rows[1:]:
+                # Skip spacer rows Textract reports as empty cells
+                if any(cell.strip() for cell in row):
+                    transactions.append(dict(zip(header, row)))
         
-        return ' '.join(text_parts)
+        return transactions
     
-    def _calculate_confidence_scores(self, blocks: List[Dict]) -> Dict[str, float]:
+    def _calculate_confidence_scores(self, confidences: List[float]) -> Dict[str, float]:
         """Calculate confidence scores for extracted data"""
-        confidences = []
-        
-        for block in blocks:
-            if 'Confidence' in block:
-                confidences.append(block['Confidence'])
+        if np is not None:
+            scores = np.asarray(confidences, dtype=np.float64)
+            if scores.size == 0:
+                return {'average': 0.0, 'minimum': 0.0, 'maximum': 0.0}
+            return {
+                'average': float(scores.mean()),
+                'minimum': float(scores.min()),
+                'maximum': float(scores.max())
+            }
         
         if confidences:
             return {
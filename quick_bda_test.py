@@ -6,6 +6,10 @@ Quick test to see the exact BDA error
 import requests
 import json
 
+# One keep-alive connection pool for every request the script makes
+SESSION = requests.Session()
+SESSION.mount('http://', requests.adapters.HTTPAdapter(pool_connections=16, pool_maxsize=32))
+
 def quick_bda_test():
     """Quick test of BDA upload to see exact error"""
     
@@ -20,7 +24,7 @@ def quick_bda_test():
             files = {'file': ('w-2.pdf', f, 'application/pdf')}
             
             print("📤 Uploading W-2 to BDA project...")
-            response = requests.post(
+            response = SESSION.post(
                 f"{API_URL}/blueprint/project/test-w2-fixed-1765841521/upload",
                 files=files
             )
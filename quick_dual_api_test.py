@@ -3,6 +3,7 @@
 Quick Dual API Test - Fast testing of both Python and C# APIs
 """
 
+import asyncio
 import subprocess
 import time
 import requests
@@ -10,10 +11,18 @@ import json
 import os
 import signal
 import sys
-from concurrent.futures import ThreadPoolExecutor, as_completed
 
-def test_api_quick(api_name: str, port: int) -> dict:
-    """Quick test of an API"""
+try:
+    import httpx  # Async client; without it the probes run on the requests session in threads
+except ImportError:
+    httpx = None
+
+# One keep-alive connection pool for the health checks and the fallback probes
+SESSION = requests.Session()
+SESSION.mount('http://', requests.adapters.HTTPAdapter(pool_connections=16, pool_maxsize=32))
+
+async def test_api_quick(api_name: str, port: int) -> dict:
+    """Quick test of an API; the three probes share one connection pool and run concurrently"""
     results = {
         'name': api_name,
         'port': port,
@@ -25,57 +34,69 @@ def test_api_quick(api_name: str, port: int) -> dict:
     
     base_url = f"http://localhost:{port}"
     
-    try:
-        # Health check with timing
-        start_time = time.time()
-        response = requests.get(f"{base_url}/health", timeout=5)
-        end_time = time.time()
-        
-        if response.status_code == 200:
-            results['health'] = True
-            results['response_time'] = round((end_time - start_time) * 1000, 2)
-            health_data = response.json()
-            print(f"✅ {api_name} Health ({results['response_time']}ms): {health_data.get('Message', 'OK')}")
-        else:
-            print(f"❌ {api_name} Health: Failed ({response.status_code})")
-            return results
-    except Exception as e:
-        print(f"❌ {api_name} Health: Error - {str(e)}")
-        return results
+    # Quick upload test payload
+    test_content = f"Test W-2 from {api_name} API - {time.time()}"
+    files = {'file': (f'test-{api_name.lower()}.txt', test_content.encode(), 'text/plain')}
     
-    try:
-        # Projects list
-        response = requests.get(f"{base_url}/blueprint/projects", timeout=10)
-        if response.status_code == 200:
-            results['projects'] = True
-            projects_data = response.json()
-            project_count = len(projects_data.get('projects', projects_data.get('Projects', [])))
-            print(f"✅ {api_name} Projects: {project_count} found")
-        else:
-            print(f"❌ {api_name} Projects: Failed ({response.status_code})")
-    except Exception as e:
-        print(f"❌ {api_name} Projects: Error - {str(e)}")
+    upload_path = "/blueprint/project/test-w2-fixed-1765841521/upload"
     
-    try:
-        # Quick upload test
-        test_content = f"Test W-2 from {api_name} API - {time.time()}"
-        files = {'file': (f'test-{api_name.lower()}.txt', test_content.encode(), 'text/plain')}
-        
-        response = requests.post(
-            f"{base_url}/blueprint/project/test-w2-fixed-1765841521/upload",
-            files=files,
-            timeout=20
+    async def timed(request):
+        start_time = time.time()
+        response = await request
+        return response, time.time() - start_time
+    
+    if httpx is not None:
+        async with httpx.AsyncClient(base_url=base_url) as client:
+            health, projects, upload = await asyncio.gather(
+                timed(client.get("/health", timeout=5)),
+                client.get("/blueprint/projects", timeout=10),
+                client.post(upload_path, files=files, timeout=20),
+                return_exceptions=True
+            )
+    else:
+        # Same three probes, each on a worker thread over the shared keep-alive session
+        health, projects, upload = await asyncio.gather(
+            timed(asyncio.to_thread(SESSION.get, f"{base_url}/health", timeout=5)),
+            asyncio.to_thread(SESSION.get, f"{base_url}/blueprint/projects", timeout=10),
+            asyncio.to_thread(SESSION.post, f"{base_url}{upload_path}", files=files, timeout=20),
+            return_exceptions=True
         )
-        
-        if response.status_code == 200:
-            results['upload'] = True
-            upload_data = response.json()
-            status = upload_data.get('status', upload_data.get('Status', 'Unknown'))
-            print(f"✅ {api_name} Upload: {status}")
-        else:
-            print(f"❌ {api_name} Upload: Failed ({response.status_code})")
-    except Exception as e:
-        print(f"❌ {api_name} Upload: Error - {str(e)}")
+    
+    # Health check with timing
+    if isinstance(health, Exception):
+        print(f"❌ {api_name} Health: Error - {str(health)}")
+        return results
+    response, elapsed = health
+    if response.status_code == 200:
+        results['health'] = True
+        results['response_time'] = round(elapsed * 1000, 2)
+        health_data = response.json()
+        print(f"✅ {api_name} Health ({results['response_time']}ms): {health_data.get('Message', 'OK')}")
+    else:
+        print(f"❌ {api_name} Health: Failed ({response.status_code})")
+        return results
+    
+    # Projects list
+    if isinstance(projects, Exception):
+        print(f"❌ {api_name} Projects: Error - {str(projects)}")
+    elif projects.status_code == 200:
+        results['projects'] = True
+        projects_data = projects.json()
+        project_count = len(projects_data.get('projects', projects_data.get('Projects', [])))
+        print(f"✅ {api_name} Projects: {project_count} found")
+    else:
+        print(f"❌ {api_name} Projects: Failed ({projects.status_code})")
+    
+    # Upload
+    if isinstance(upload, Exception):
+        print(f"❌ {api_name} Upload: Error - {str(upload)}")
+    elif upload.status_code == 200:
+        results['upload'] = True
+        upload_data = upload.json()
+        status = upload_data.get('status', upload_data.get('Status', 'Unknown'))
+        print(f"✅ {api_name} Upload: {status}")
+    else:
+        print(f"❌ {api_name} Upload: Failed ({upload.status_code})")
     
     return results
 
@@ -85,13 +106,13 @@ def check_processes():
     csharp_running = False
     
     try:
-        response = requests.get("http://localhost:8000/health", timeout=2)
+        response = SESSION.get("http://localhost:8000/health", timeout=2)
         python_running = response.status_code == 200
     except:
         pass
     
     try:
-        response = requests.get("http://localhost:5000/health", timeout=2)
+        response = SESSION.get("http://localhost:5000/health", timeout=2)
         csharp_running = response.status_code == 200
     except:
         pass
@@ -119,19 +140,18 @@ def main():
     print("\n📋 Testing Available APIs...")
     
     # Test APIs concurrently
-    results = []
+    tests = []
     
-    with ThreadPoolExecutor(max_workers=2) as executor:
-        futures = []
-        
-        if python_running:
-            futures.append(executor.submit(test_api_quick, "Python", 8000))
-        
-        if csharp_running:
-            futures.append(executor.submit(test_api_quick, "C#", 5000))
-        
-        for future in as_completed(futures):
-            results.append(future.result())
+    if python_running:
+        tests.append(test_api_quick("Python", 8000))
+    
+    if csharp_running:
+        tests.append(test_api_quick("C#", 5000))
+    
+    async def run_tests():
+        return await asyncio.gather(*tests)
+    
+    results = asyncio.run(run_tests())
     
     # Summary
     print("\n📊 QUICK TEST SUMMARY")
@@ -3,31 +3,32 @@
 Restart the API server and test the BDA fix
 """
 
+import asyncio
 import subprocess
-import time
 import requests
 import os
-import signal
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), 'shared'))
+from utils.process_utils import open_server_log, pids_on_port, stop_process, terminate_pid, use_fast_event_loop, wait_ready
+
+# One keep-alive connection pool for every request the script makes
+SESSION = requests.Session()
+SESSION.mount('http://', requests.adapters.HTTPAdapter(pool_connections=2, pool_maxsize=4))
 
 def cleanup_port_8000():
     """Clean up port 8000"""
     try:
-        result = subprocess.run(['lsof', '-ti', ':8000'], 
-                              capture_output=True, text=True, timeout=5)
+        pids = pids_on_port(8000)
         
-        if result.returncode == 0 and result.stdout.strip():
-            pids = result.stdout.strip().split('\n')
-            for pid_str in pids:
-                if pid_str.strip().isdigit():
-                    pid = int(pid_str)
-                    print(f"🔄 Stopping process {pid} on port 8000...")
-                    try:
-                        os.kill(pid, signal.SIGTERM)
-                        time.sleep(2)
-                        os.kill(pid, signal.SIGKILL)
-                    except ProcessLookupError:
-                        pass
-                    print(f"✅ Process {pid} stopped")
+        if pids:
+            for pid in pids:
+                print(f"🔄 Stopping process {pid} on port 8000...")
+                try:
+                    terminate_pid(pid, 2.0)
+                except ProcessLookupError:
+                    pass
+                print(f"✅ Process {pid} stopped")
         else:
             print("✅ Port 8000 is free")
     except Exception as e:
@@ -40,24 +41,19 @@ def start_api_server():
     api_dir = "python/BlueprintAPI/src"
     
     # Start the server in background
-    process = subprocess.Popen(
-        ["python", "api.py"],
-        cwd=api_dir,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE
-    )
+    with open_server_log("python-api") as log:
+        process = subprocess.Popen(
+            ["python", "api.py"],
+            cwd=api_dir,
+            stdout=log,
+            stderr=subprocess.STDOUT
+        )
     
     # Wait for startup
     print("⏳ Waiting for API to start...")
-    for i in range(10):
-        time.sleep(1)
-        try:
-            response = requests.get("http://localhost:8000/health", timeout=2)
-            if response.status_code == 200:
-                print("✅ API server started successfully!")
-                return process
-        except:
-            continue
+    if asyncio.run(wait_ready("http://localhost:8000/health", 10)) is not None:
+        print("✅ API server started successfully!")
+        return process
     
     print("❌ API server failed to start")
     return None
@@ -68,7 +64,7 @@ def test_bda_upload():
     
     try:
         # Test with a simple project list first
-        response = requests.get("http://localhost:8000/blueprint/projects")
+        response = SESSION.get("http://localhost:8000/blueprint/projects")
         if response.status_code == 200:
             print("✅ API responding correctly")
             
@@ -118,11 +114,10 @@ def main():
         # Clean up
         print("\n🛑 Stopping API server...")
         try:
-            process.terminate()
-            time.sleep(2)
-            process.kill()
+            stop_process(process)
         except:
             pass
 
 if __name__ == "__main__":
+    use_fast_event_loop()
     main()
\ No newline at end of file
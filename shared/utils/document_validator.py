@@ -1,40 +1,59 @@
 """
 Common document validation utilities for BDA projects
 """
+import functools
 import json
 import os
-from typing import Dict, List, Optional
+import types
+from typing import Any, Dict, List, Mapping, Optional
+
+BYTES_PER_MB = 1024 * 1024
+
+def _freeze(value: Any) -> Any:
+    """Recursively turn dicts into read-only mappings and lists into tuples"""
+    if isinstance(value, dict):
+        return types.MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+@functools.lru_cache(maxsize=8)
+def _load_config(config_path: str) -> Mapping:
+    """Parse a config file once per path; every validator shares the same deeply read-only mapping"""
+    with open(config_path, 'r') as f:
+        config = json.load(f)
+    
+    # Size limits are checked in bytes, so convert them once here rather than on every upload
+    for doc_type_config in config.get('document_types', {}).values():
+        doc_type_config['max_size_bytes'] = int(doc_type_config['max_size_mb'] * BYTES_PER_MB)
+    
+    # Frozen all the way down, so no validator can change what the others see
+    return _freeze(config)
 
 class DocumentValidator:
     def __init__(self, config_path: str = None):
         if config_path is None:
             config_path = os.path.join(os.path.dirname(__file__), '..', 'config', 'aws-config.json')
         
-        with open(config_path, 'r') as f:
-            self.config = json.load(f)
+        self.config = _load_config(os.path.abspath(config_path))
+        self._doc_types = self.config['document_types']
     
-    def validate_document_type(self, file_path: str, doc_type: str) -> Dict[str, bool]:
+    def validate_document_type(self, file_path: str, doc_type: str) -> Dict[str, Any]:
         """Validate document against type requirements"""
-        result = {
-            'valid': True,
-            'errors': []
-        }
-        
-        if doc_type not in self.config['document_types']:
-            result['valid'] = False
-            result['errors'].append(f"Unknown document type: {doc_type}")
-            return result
+        doc_type_config = self._doc_types.get(doc_type)
+        if doc_type_config is None:
+            return {'valid': False, 'errors': [f"Unknown document type: {doc_type}"]}
         
         # Check file size
-        file_size_mb = os.path.getsize(file_path) / (1024 * 1024)
-        max_size = self.config['document_types'][doc_type]['max_size_mb']
+        file_size = os.stat(file_path).st_size
+        if file_size <= doc_type_config['max_size_bytes']:
+            return {'valid': True, 'errors': []}
         
-        if file_size_mb > max_size:
-            result['valid'] = False
-            result['errors'].append(f"File size {file_size_mb:.2f}MB exceeds limit of {max_size}MB")
-        
-        return result
+        return {
+            'valid': False,
+            'errors': [f"File size {file_size / BYTES_PER_MB:.2f}MB exceeds limit of {doc_type_config['max_size_mb']}MB"]
+        }
     
     def get_supported_formats(self, doc_type: str) -> List[str]:
         """Get supported MIME types for document type"""
-        return self.config['document_types'].get(doc_type, {}).get('mime_types', [])
\ No newline at end of file
+        return list(self._doc_types.get(doc_type, {}).get('mime_types', ()))
\ No newline at end of file
@@ -0,0 +1,245 @@
+"""
+Common helpers for starting local API servers and waiting on them
+"""
+import asyncio
+import functools
+import json
+import os
+import selectors
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+try:
+    import psutil  # Reads listening sockets straight from the kernel tables
+except ImportError:
+    psutil = None
+
+try:
+    import uvloop  # libuv-backed event loop with cheaper awaits than the stock one
+except ImportError:
+    uvloop = None
+
+try:
+    import uvicorn  # Lets a launcher host a Python API on a thread instead of a new interpreter
+except ImportError:
+    uvicorn = None
+
+# Health checks are plain HTTP/1.0 GETs on loopback. Connection refusals come back
+# immediately; the read timeout covers a slow first request.
+HEALTH_CONNECT_TIMEOUT_SECONDS = 0.5
+HEALTH_READ_TIMEOUT_SECONDS = 2.0
+HEALTH_PROBE_INTERVAL_SECONDS = 0.1
+
+# Server output goes here instead of an undrained pipe, which stalls the child once it fills
+LOG_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'logs'))
+
+# Only used where pidfd_open is unavailable (non-Linux, or kernels older than 5.3)
+EXIT_POLL_INTERVAL_SECONDS = 0.05
+
+@functools.lru_cache(maxsize=8)
+def dir_exists(path: str) -> bool:
+    """Whether a project directory exists; checked once per process, since restarts do not move it"""
+    return os.path.isdir(path)
+
+def use_fast_event_loop():
+    """Make later asyncio.run calls use uvloop when it is installed"""
+    if uvloop is not None:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+
+class InProcessServer:
+    """A uvicorn server running on a daemon thread of the current process"""
+
+    supported = uvicorn is not None
+
+    def __init__(self, app: str, app_dir: str, port: int):
+        self.app = app
+        self.app_dir = os.path.abspath(app_dir)
+        self.port = port
+        self.server = None
+        self.thread = None
+
+    def start(self):
+        """Import the app and start serving in the background"""
+        if self.app_dir not in sys.path:
+            sys.path.insert(0, self.app_dir)
+
+        config = uvicorn.Config(self.app, host="0.0.0.0", port=self.port, log_level="warning")
+        self.server = uvicorn.Server(config)
+        # Off the main thread uvicorn leaves signal handling to the launcher
+        self.thread = threading.Thread(target=self.server.run, name=f"uvicorn-{self.port}", daemon=True)
+        self.thread.start()
+
+    def stop(self, timeout: float = 5.0) -> bool:
+        """Ask the server to shut down, forcing it if it outlives the timeout; returns True if it stopped gracefully"""
+        self.server.should_exit = True
+        self.thread.join(timeout)
+        if not self.thread.is_alive():
+            return True
+
+        self.server.force_exit = True
+        self.thread.join(timeout)
+        return False
+
+def open_server_log(name: str):
+    """Open logs/<name>.log for appending, for a child's stdout and stderr"""
+    os.makedirs(LOG_DIR, exist_ok=True)
+    return open(os.path.join(LOG_DIR, f"{name}.log"), 'ab')
+
+def _health_request(host: str, path: str) -> bytes:
+    return f"GET {path} HTTP/1.0\r\nHost: {host}\r\n\r\n".encode('ascii')
+
+def _ok_body(response: bytes) -> Optional[bytes]:
+    """The body of a raw HTTP response if its status is 200, otherwise None"""
+    status_line, _, rest = response.partition(b'\r\n')
+    if status_line.split(b' ', 2)[1:2] != [b'200']:
+        return None
+    return rest.partition(b'\r\n\r\n')[2]
+
+def http_ok(host: str, port: int, path: str = '/health') -> bool:
+    """True if a loopback endpoint answers 200; a bare socket round-trip instead of an HTTP client"""
+    try:
+        with socket.create_connection((host, port), timeout=HEALTH_CONNECT_TIMEOUT_SECONDS) as sock:
+            sock.settimeout(HEALTH_READ_TIMEOUT_SECONDS)
+            sock.sendall(_health_request(host, path))
+            return _ok_body(sock.recv(64)) is not None
+    except OSError:
+        return False
+
+async def get_health(host: str, port: int, path: str = '/health') -> Optional[bytes]:
+    """GET a loopback endpoint over a bare connection; returns the body on 200, otherwise None"""
+    try:
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), HEALTH_CONNECT_TIMEOUT_SECONDS)
+    except (OSError, asyncio.TimeoutError):
+        return None
+
+    try:
+        writer.write(_health_request(host, path))
+        # HTTP/1.0: the server closes the connection once the response is written
+        response = await asyncio.wait_for(reader.read(), HEALTH_READ_TIMEOUT_SECONDS)
+    except (OSError, asyncio.TimeoutError):
+        return None
+    finally:
+        writer.close()
+
+    return _ok_body(response)
+
+async def wait_ready(url: str, timeout: float) -> Optional[Dict]:
+    """Poll a health endpoint until it answers 200; returns its JSON body, or None if the timeout passes first"""
+    parts = urlsplit(url)
+    deadline = time.monotonic() + timeout
+
+    while time.monotonic() < deadline:
+        body = await get_health(parts.hostname, parts.port, parts.path or '/')
+        if body is not None:
+            try:
+                return json.loads(body)
+            except ValueError:
+                return {}
+
+        await asyncio.sleep(HEALTH_PROBE_INTERVAL_SECONDS)
+
+    return None
+
+def _open_pidfd(pid: int) -> Optional[int]:
+    """A pidfd for the process, or None where pidfds are unsupported; raises ProcessLookupError if it is gone"""
+    pidfd_open = getattr(os, 'pidfd_open', None)
+    if pidfd_open is None:
+        return None
+    try:
+        return pidfd_open(pid)
+    except ProcessLookupError:
+        raise
+    except OSError:
+        return None
+
+def _wait_pidfd(pidfd: int, timeout: float) -> bool:
+    """The pidfd turns readable the moment its process exits"""
+    with selectors.DefaultSelector() as selector:
+        selector.register(pidfd, selectors.EVENT_READ)
+        return bool(selector.select(timeout))
+
+def wait_exit(pid: int, timeout: float) -> bool:
+    """Block until a process that is not our child exits or the timeout passes; returns True if it exited"""
+    try:
+        pidfd = _open_pidfd(pid)
+    except ProcessLookupError:
+        return True
+
+    if pidfd is not None:
+        try:
+            return _wait_pidfd(pidfd, timeout)
+        finally:
+            os.close(pidfd)
+
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return True
+        except PermissionError:
+            pass
+
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(EXIT_POLL_INTERVAL_SECONDS)
+
+def terminate_pid(pid: int, timeout: float = 2.0) -> bool:
+    """SIGTERM a process we did not spawn, then SIGKILL it if it outlives the timeout; returns True if SIGTERM was enough"""
+    # Signalling through a pidfd can never hit another process that reused the PID in the meantime
+    try:
+        pidfd = _open_pidfd(pid)
+    except ProcessLookupError:
+        return True
+
+    if pidfd is None:
+        os.kill(pid, signal.SIGTERM)
+        if wait_exit(pid, timeout):
+            return True
+        os.kill(pid, signal.SIGKILL)
+        return False
+
+    try:
+        signal.pidfd_send_signal(pidfd, signal.SIGTERM)
+        if _wait_pidfd(pidfd, timeout):
+            return True
+        signal.pidfd_send_signal(pidfd, signal.SIGKILL)
+        return False
+    except ProcessLookupError:
+        return True
+    finally:
+        os.close(pidfd)
+
+def pids_on_port(port: int) -> List[int]:
+    """PIDs of processes listening on a local TCP port"""
+    if psutil is not None:
+        try:
+            return sorted({
+                connection.pid for connection in psutil.net_connections(kind='inet')
+                if connection.laddr and connection.laddr.port == port
+                and connection.status == psutil.CONN_LISTEN and connection.pid
+            })
+        except psutil.AccessDenied:
+            pass  # macOS needs root to list other users' sockets; lsof can still see ours
+
+    result = subprocess.run(['lsof', '-ti', f':{port}'], capture_output=True, text=True, timeout=5)
+    return [int(pid) for pid in result.stdout.split() if pid.isdigit()]
+
+def stop_process(process: subprocess.Popen, timeout: float = 2.0) -> bool:
+    """Terminate a child, killing it if it outlives the timeout; returns True if SIGTERM was enough"""
+    process.terminate()
+    # Our own child has to be reaped, not probed: until then it is a zombie that still
+    # answers the kill(pid, 0) check wait_exit falls back to without pidfds
+    try:
+        process.wait(timeout)
+        return True
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+        return False
@@ -3,42 +3,54 @@
 Simple BDA diagnostic - check the most important things
 """
 
-import subprocess
+import boto3
 import json
+from concurrent.futures import ThreadPoolExecutor
 
-def run_cmd(cmd, desc):
+BDA_BUCKET = "bda-project-storage-a07a2d75b205"
+
+def report(desc, call, future):
     print(f"\n🔍 {desc}")
-    print(f"$ {cmd}")
+    print(f"$ {call}")
     try:
-        result = subprocess.run(cmd.split(), capture_output=True, text=True, timeout=15)
-        if result.returncode == 0:
-            print("✅ SUCCESS:")
-            print(result.stdout)
-        else:
-            print("❌ ERROR:")
-            print(result.stderr)
-        return result.returncode == 0
+        response = future.result()
+        response.pop('ResponseMetadata', None)
+        print("✅ SUCCESS:")
+        print(json.dumps(response, indent=2, default=str))
+        return True
     except Exception as e:
-        print(f"❌ FAILED: {e}")
+        print("❌ ERROR:")
+        print(e)
         return False
 
 def main():
     print("🔍 Simple BDA Diagnostic")
     print("=" * 40)
     
-    # Check 1: AWS credentials
-    run_cmd("aws sts get-caller-identity", "Checking AWS credentials")
-    
-    # Check 2: List BDA projects
-    run_cmd("aws bedrock-data-automation list-data-automation-projects --region us-east-1", 
-            "Listing BDA projects")
+    # One session and one connection pool per service; clients are thread-safe for API calls
+    session = boto3.Session(region_name='us-east-1')
+    sts = session.client('sts')
+    bda = session.client('bedrock-data-automation')
+    s3 = session.client('s3')
     
-    # Check 3: Check S3 bucket
-    run_cmd("aws s3 ls s3://bda-project-storage-a07a2d75b205/", 
-            "Checking S3 bucket")
+    checks = [
+        # Check 1: AWS credentials
+        ("Checking AWS credentials", "sts.get_caller_identity()", sts.get_caller_identity, {}),
+        # Check 2: List BDA projects
+        ("Listing BDA projects", "bedrock-data-automation.list_data_automation_projects()",
+         bda.list_data_automation_projects, {}),
+        # Check 3: Check S3 bucket
+        ("Checking S3 bucket", f"s3.list_objects_v2(Bucket='{BDA_BUCKET}', Delimiter='/')",
+         s3.list_objects_v2, {'Bucket': BDA_BUCKET, 'Delimiter': '/'}),
+        # Check 4: List all S3 buckets with 'bda' in name
+        ("Listing all S3 buckets", "s3.list_buckets()", s3.list_buckets, {}),
+    ]
     
-    # Check 4: List all S3 buckets with 'bda' in name
-    run_cmd("aws s3 ls", "Listing all S3 buckets")
+    # The checks are independent, so run them all at once and report in order
+    with ThreadPoolExecutor(max_workers=len(checks)) as executor:
+        futures = [executor.submit(func, **kwargs) for _, _, func, kwargs in checks]
+        for (desc, call, _, _), future in zip(checks, futures):
+            report(desc, call, future)
     
     print("\n" + "=" * 40)
     print("🎯 Key Questions:")
@@ -47,4 +59,4 @@ def main():
     print("3. Are there any files in the S3 bucket?")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -3,11 +3,27 @@
 Start the API and test BDA upload
 """
 
+import asyncio
 import subprocess
-import time
 import requests
 import signal
 import os
+import sys
+
+try:
+    from requests_toolbelt import MultipartEncoder  # Streams the multipart body from the open file
+except ImportError:
+    MultipartEncoder = None
+
+sys.path.append(os.path.join(os.path.dirname(__file__), 'shared'))
+from utils.process_utils import InProcessServer, open_server_log, stop_process, wait_ready
+
+# Cold starts import boto3 and the app, which can take well over the old fixed 5s sleep
+API_STARTUP_TIMEOUT_SECONDS = 30
+
+# One keep-alive connection pool for every request the script makes
+SESSION = requests.Session()
+SESSION.mount('http://', requests.adapters.HTTPAdapter(pool_connections=2, pool_maxsize=4))
 
 def start_api_and_test():
     """Start API and test BDA upload"""
@@ -18,37 +34,49 @@ def start_api_and_test():
     # Start the API server
     print("🔧 Starting Python API server...")
     
-    api_process = subprocess.Popen([
-        "python", "-m", "uvicorn", 
-        "python.BlueprintAPI.src.api:app", 
-        "--host", "0.0.0.0", 
-        "--port", "8000"
-    ], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    api_server = None
+    api_process = None
+    if InProcessServer.supported:
+        # Serve from this process rather than paying for a second interpreter and app import
+        api_server = InProcessServer("src.api:app", "python/BlueprintAPI", 8000)
+        api_server.start()
+    else:
+        with open_server_log("python-api") as log:
+            api_process = subprocess.Popen([
+                "python", "-m", "uvicorn", 
+                "python.BlueprintAPI.src.api:app", 
+                "--host", "0.0.0.0", 
+                "--port", "8000"
+            ], stdout=log, stderr=subprocess.STDOUT)
     
-    # Wait for API to start
+    # Wait for API to start; returns as soon as /health answers
     print("⏳ Waiting for API to start...")
-    time.sleep(5)
     
     try:
         # Test API health
         print("🔍 Testing API health...")
-        health_response = requests.get("http://localhost:8000/health", timeout=5)
-        
-        if health_response.status_code == 200:
+        if asyncio.run(wait_ready("http://localhost:8000/health", API_STARTUP_TIMEOUT_SECONDS)) is not None:
             print("✅ API is running successfully")
             
             # Test BDA upload
             print("\n🧪 Testing BDA upload...")
             
             try:
+                upload_url = "http://localhost:8000/blueprint/project/test-w2-fixed-1765841521/upload"
                 with open("test_files/w-2.pdf", 'rb') as f:
                     files = {'file': ('w-2.pdf', f, 'application/pdf')}
                     
-                    upload_response = requests.post(
-                        "http://localhost:8000/blueprint/project/test-w2-fixed-1765841521/upload",
-                        files=files,
-                        timeout=30
-                    )
+                    if MultipartEncoder is not None:
+                        # Sent in chunks as it is read, rather than built in memory first
+                        body = MultipartEncoder(fields=files)
+                        upload_response = SESSION.post(
+                            upload_url,
+                            data=body,
+                            headers={'Content-Type': body.content_type},
+                            timeout=30
+                        )
+                    else:
+                        upload_response = SESSION.post(upload_url, files=files, timeout=30)
                 
                 print(f"📊 Upload Response Status: {upload_response.status_code}")
                 
@@ -88,7 +116,7 @@ def start_api_and_test():
                 print(f"❌ Upload test failed: {str(e)}")
         
         else:
-            print(f"❌ API health check failed: {health_response.status_code}")
+            print("❌ API health check failed")
     
     except Exception as e:
         print(f"❌ API test failed: {str(e)}")
@@ -96,16 +124,11 @@ def start_api_and_test():
     finally:
         # Stop the API server
         print(f"\n🛑 Stopping API server...")
-        api_process.terminate()
-        
-        # Wait a bit for graceful shutdown
-        time.sleep(2)
-        
-        # Force kill if still running
-        try:
-            api_process.kill()
-        except:
-            pass
+        if api_server:
+            api_server.stop()
+        else:
+            # Force kill only if it outlives a graceful shutdown
+            stop_process(api_process)
         
         print("✅ API server stopped")
 
@@ -4,8 +4,11 @@ Start Both APIs - Python and C# BDA APIs
 Manages both APIs simultaneously for development and testing
 """
 
+import asyncio
+import functools
+import json
+import shutil
 import subprocess
-import time
 import requests
 import os
 import signal
@@ -13,9 +16,38 @@ import sys
 import threading
 from datetime import datetime
 
+try:
+    import orjson  # Faster decoding of the project listings
+except ImportError:
+    orjson = None
+
+sys.path.append(os.path.join(os.path.dirname(__file__), 'shared'))
+from utils.process_utils import InProcessServer, dir_exists, get_health, open_server_log, stop_process, use_fast_event_loop, wait_ready
+
+# One keep-alive connection pool for every request the script makes
+SESSION = requests.Session()
+SESSION.mount('http://', requests.adapters.HTTPAdapter(pool_connections=2, pool_maxsize=4))
+
+PYTHON_STARTUP_TIMEOUT_SECONDS = 20
+CSHARP_STARTUP_TIMEOUT_SECONDS = 30
+MONITOR_INTERVAL_SECONDS = 30
+
+def loads_json(data: bytes):
+    """Parse a JSON response body, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+@functools.lru_cache(maxsize=1)
+def has_dotnet() -> bool:
+    """True if the dotnet host is on PATH; a PATH lookup instead of starting dotnet --version"""
+    return shutil.which("dotnet") is not None
+
 class DualAPIManager:
-    def __init__(self):
+    def __init__(self, reload: bool = False):
         self.python_process = None
+        self.python_server = None  # set instead of python_process when the API runs in this process
+        self.reload = reload  # uvicorn's reloader adds a watcher process; only worth it while editing
         self.csharp_process = None
         self.python_port = 8000
         self.csharp_port = 5000
@@ -27,43 +59,47 @@ class DualAPIManager:
         print(f"🚀 {title}")
         print("=" * 60)
     
-    def start_python_api(self):
-        """Start Python API in background"""
+    async def start_python_api(self) -> bool:
+        """Start Python API in background and wait until its health check answers"""
         try:
             print("🐍 Starting Python API...")
             
             # Check if Python API directory exists
             python_dir = "python/BlueprintAPI"
-            if not os.path.exists(python_dir):
+            if not dir_exists(python_dir):
                 print(f"❌ Python directory not found: {python_dir}")
                 return False
             
-            # Start Python API
-            self.python_process = subprocess.Popen(
-                ["python3", "-m", "uvicorn", "src.api:app", "--host", "0.0.0.0", "--port", str(self.python_port), "--reload"],
-                cwd=python_dir,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True
-            )
-            
-            print(f"   Process ID: {self.python_process.pid}")
-            print(f"   Port: {self.python_port}")
+            # Start Python API; in this process unless the reloader (which needs its own process) was asked for
+            if InProcessServer.supported and not self.reload:
+                self.python_server = InProcessServer("src.api:app", python_dir, self.python_port)
+                self.python_server.start()
+                
+                print(f"   Process ID: {os.getpid()} (in-process)")
+                print(f"   Port: {self.python_port}")
+            else:
+                command = ["python3", "-m", "uvicorn", "src.api:app", "--host", "0.0.0.0", "--port", str(self.python_port)]
+                if self.reload:
+                    command.append("--reload")
+                with open_server_log("python-api") as log:
+                    self.python_process = await asyncio.to_thread(
+                        subprocess.Popen,
+                        command,
+                        cwd=python_dir,
+                        stdout=log,
+                        stderr=subprocess.STDOUT
+                    )
+                
+                print(f"   Process ID: {self.python_process.pid}")
+                print(f"   Port: {self.python_port}")
+                print("   Log: logs/python-api.log")
             
             # Wait for startup
-            for attempt in range(20):
-                try:
-                    response = requests.get(f"http://localhost:{self.python_port}/health", timeout=2)
-                    if response.status_code == 200:
-                        result = response.json()
-                        print(f"✅ Python API ready: {result.get('Message', 'OK')}")
-                        return True
-                except:
-                    pass
-                
-                time.sleep(1)
-                if attempt % 5 == 0:
-                    print(f"   Waiting for Python API... ({attempt + 1}/20)")
+            print("   Waiting for Python API...")
+            result = await wait_ready(f"http://localhost:{self.python_port}/health", PYTHON_STARTUP_TIMEOUT_SECONDS)
+            if result is not None:
+                print(f"✅ Python API ready: {result.get('Message', 'OK')}")
+                return True
             
             print("❌ Python API failed to start within timeout")
             return False
@@ -72,50 +108,42 @@ class DualAPIManager:
             print(f"❌ Failed to start Python API: {str(e)}")
             return False
     
-    def start_csharp_api(self):
-        """Start C# API in background"""
+    async def start_csharp_api(self) -> bool:
+        """Start C# API in background and wait until its health check answers"""
         try:
             print("🔷 Starting C# API...")
             
             # Check if C# API directory exists
             csharp_dir = "csharp/BlueprintAPI"
-            if not os.path.exists(csharp_dir):
+            if not dir_exists(csharp_dir):
                 print(f"❌ C# directory not found: {csharp_dir}")
                 return False
             
             # Check .NET SDK
-            try:
-                subprocess.run(["dotnet", "--version"], capture_output=True, check=True)
-            except:
+            if not has_dotnet():
                 print("❌ .NET SDK not found. Install from: https://dotnet.microsoft.com/download")
                 return False
             
             # Start C# API
-            self.csharp_process = subprocess.Popen(
-                ["dotnet", "run", "--configuration", "Release"],
-                cwd=csharp_dir,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True
-            )
+            with open_server_log("csharp-api") as log:
+                self.csharp_process = await asyncio.to_thread(
+                    subprocess.Popen,
+                    ["dotnet", "run", "--configuration", "Release"],
+                    cwd=csharp_dir,
+                    stdout=log,
+                    stderr=subprocess.STDOUT
+                )
             
             print(f"   Process ID: {self.csharp_process.pid}")
             print(f"   Port: {self.csharp_port}")
+            print("   Log: logs/csharp-api.log")
             
             # Wait for startup
-            for attempt in range(30):
-                try:
-                    response = requests.get(f"http://localhost:{self.csharp_port}/health", timeout=2)
-                    if response.status_code == 200:
-                        result = response.json()
-                        print(f"✅ C# API ready: {result.get('Message', 'OK')}")
-                        return True
-                except:
-                    pass
-                
-                time.sleep(1)
-                if attempt % 5 == 0:
-                    print(f"   Waiting for C# API... ({attempt + 1}/30)")
+            print("   Waiting for C# API...")
+            result = await wait_ready(f"http://localhost:{self.csharp_port}/health", CSHARP_STARTUP_TIMEOUT_SECONDS)
+            if result is not None:
+                print(f"✅ C# API ready: {result.get('Message', 'OK')}")
+                return True
             
             print("❌ C# API failed to start within timeout")
             return False
@@ -124,30 +152,22 @@ class DualAPIManager:
             print(f"❌ Failed to start C# API: {str(e)}")
             return False
     
-    def monitor_apis(self):
-        """Monitor API health in background"""
+    async def monitor_apis(self):
+        """Monitor API health in background; both checks run concurrently"""
         while self.running:
             try:
-                time.sleep(30)  # Check every 30 seconds
+                await asyncio.sleep(MONITOR_INTERVAL_SECONDS)
                 
                 if not self.running:
                     break
                 
-                # Check Python API
-                python_ok = False
-                try:
-                    response = requests.get(f"http://localhost:{self.python_port}/health", timeout=3)
-                    python_ok = response.status_code == 200
-                except:
-                    pass
-                
-                # Check C# API
-                csharp_ok = False
-                try:
-                    response = requests.get(f"http://localhost:{self.csharp_port}/health", timeout=3)
-                    csharp_ok = response.status_code == 200
-                except:
-                    pass
+                # Check Python and C# APIs
+                python_body, csharp_body = await asyncio.gather(
+                    get_health("localhost", self.python_port),
+                    get_health("localhost", self.csharp_port)
+                )
+                python_ok = python_body is not None
+                csharp_ok = csharp_body is not None
                 
                 # Status update
                 timestamp = datetime.now().strftime("%H:%M:%S")
@@ -157,7 +177,7 @@ class DualAPIManager:
                 print(f"[{timestamp}] Status: Python {python_status} | C# {csharp_status}")
                 
                 # Alert if APIs are down
-                if not python_ok and self.python_process:
+                if not python_ok and (self.python_process or self.python_server):
                     print("⚠️ Python API appears to be down!")
                 
                 if not csharp_ok and self.csharp_process:
@@ -173,9 +193,9 @@ class DualAPIManager:
         
         # Test Python API
         try:
-            response = requests.get(f"http://localhost:{self.python_port}/blueprint/projects", timeout=10)
+            response = SESSION.get(f"http://localhost:{self.python_port}/blueprint/projects", timeout=10)
             if response.status_code == 200:
-                projects = response.json()
+                projects = loads_json(response.content)
                 project_count = len(projects.get('projects', []))
                 print(f"✅ Python API: {project_count} projects found")
             else:
@@ -185,9 +205,9 @@ class DualAPIManager:
         
         # Test C# API
         try:
-            response = requests.get(f"http://localhost:{self.csharp_port}/blueprint/projects", timeout=10)
+            response = SESSION.get(f"http://localhost:{self.csharp_port}/blueprint/projects", timeout=10)
             if response.status_code == 200:
-                projects = response.json()
+                projects = loads_json(response.content)
                 project_count = len(projects.get('Projects', []))
                 print(f"✅ C# API: {project_count} projects found")
             else:
@@ -203,7 +223,7 @@ class DualAPIManager:
         print(f"   URL: http://localhost:{self.python_port}")
         print(f"   Health: http://localhost:{self.python_port}/health")
         print(f"   Projects: http://localhost:{self.python_port}/blueprint/projects")
-        print(f"   Process: {'Running' if self.python_process else 'Not Started'}")
+        print(f"   Process: {'Running' if self.python_process or self.python_server else 'Not Started'}")
         
         print(f"\n🔷 C# API:")
         print(f"   URL: http://localhost:{self.csharp_port}")
@@ -224,43 +244,37 @@ class DualAPIManager:
         print("\n🧹 Shutting down APIs...")
         self.running = False
         
+        if self.python_server:
+            if self.python_server.stop(timeout=5):
+                print("✅ Python API stopped")
+            else:
+                print("🔨 Python API force stopped")
+        
         if self.python_process:
-            try:
-                self.python_process.terminate()
-                self.python_process.wait(timeout=5)
+            if stop_process(self.python_process, timeout=5):
                 print("✅ Python API stopped")
-            except:
-                self.python_process.kill()
+            else:
                 print("🔨 Python API force stopped")
         
         if self.csharp_process:
-            try:
-                self.csharp_process.terminate()
-                self.csharp_process.wait(timeout=5)
+            if stop_process(self.csharp_process, timeout=5):
                 print("✅ C# API stopped")
-            except:
-                self.csharp_process.kill()
+            else:
                 print("🔨 C# API force stopped")
     
+    async def start_apis(self):
+        """Launch both APIs; returns once the slower one is ready or has timed out"""
+        # Popen rather than create_subprocess_exec: asyncio kills its children when this startup loop closes
+        results = await asyncio.gather(self.start_python_api(), self.start_csharp_api(), return_exceptions=True)
+        return [result is True for result in results]
+    
     def start_both_apis(self):
         """Start both APIs and manage them"""
         self.print_header("DUAL BDA API MANAGER")
         print("Starting both Python and C# BDA APIs for development and testing")
         
-        # Start APIs concurrently
-        python_thread = threading.Thread(target=self.start_python_api)
-        csharp_thread = threading.Thread(target=self.start_csharp_api)
-        
-        python_thread.start()
-        csharp_thread.start()
-        
-        # Wait for both to complete startup
-        python_thread.join()
-        csharp_thread.join()
-        
-        # Check if both started successfully
-        python_ok = self.python_process is not None
-        csharp_ok = self.csharp_process is not None
+        # Start both APIs and wait on their health checks concurrently
+        python_ok, csharp_ok = asyncio.run(self.start_apis())
         
         if not python_ok and not csharp_ok:
             print("\n❌ Both APIs failed to start!")
@@ -279,20 +293,26 @@ class DualAPIManager:
         # Show status
         self.show_status()
         
-        # Start monitoring in background
-        monitor_thread = threading.Thread(target=self.monitor_apis, daemon=True)
+        # Start monitoring in background, on its own event loop
+        monitor_thread = threading.Thread(target=asyncio.run, args=(self.monitor_apis(),), daemon=True)
         monitor_thread.start()
         
         return True
 
+# Set by the signal handler; the main thread parks on it instead of waking every second
+shutdown_requested = threading.Event()
+
 def main():
     """Main function"""
-    manager = DualAPIManager()
+    manager = DualAPIManager(reload="--reload" in sys.argv[1:])
+    parked = False
     
     def signal_handler(sig, frame):
         print("\n🛑 Received shutdown signal...")
-        manager.cleanup()
-        sys.exit(0)
+        shutdown_requested.set()
+        if not parked:
+            # Still starting up: abort startup, the finally block cleans up
+            raise KeyboardInterrupt
     
     signal.signal(signal.SIGINT, signal_handler)
     signal.signal(signal.SIGTERM, signal_handler)
@@ -304,9 +324,9 @@ def main():
             print("\n⏳ APIs are running. Press Ctrl+C to stop...")
             print("💡 Run 'python3 quick_dual_api_test.py' in another terminal to test")
             
-            # Keep running
-            while True:
-                time.sleep(1)
+            # Keep running until a shutdown signal arrives
+            parked = True
+            shutdown_requested.wait()
         else:
             print("\n❌ Failed to start APIs")
             sys.exit(1)
@@ -319,4 +339,5 @@ def main():
         manager.cleanup()
 
 if __name__ == "__main__":
+    use_fast_event_loop()
     main()
\ No newline at end of file
@@ -3,13 +3,16 @@
 Start the C# BDA API and test it
 """
 
+import asyncio
 import subprocess
 import time
-import requests
 import os
 import signal
 import sys
 
+sys.path.append(os.path.join(os.path.dirname(__file__), 'shared'))
+from utils.process_utils import dir_exists, open_server_log, use_fast_event_loop, wait_ready
+
 def start_csharp_api():
     """Start the C# BDA API"""
     
@@ -19,7 +22,7 @@ def start_csharp_api():
     # Change to C# directory
     csharp_dir = "csharp/BlueprintAPI"
     
-    if not os.path.exists(csharp_dir):
+    if not dir_exists(csharp_dir):
         print(f"❌ C# directory not found: {csharp_dir}")
         return None
     
@@ -28,30 +31,21 @@ def start_csharp_api():
     try:
         # Start the C# API
         print("🔥 Starting C# .NET API...")
-        process = subprocess.Popen(
-            ["dotnet", "run"],
-            cwd=csharp_dir,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True
-        )
+        with open_server_log("csharp-api") as log:
+            process = subprocess.Popen(
+                ["dotnet", "run"],
+                cwd=csharp_dir,
+                stdout=log,
+                stderr=subprocess.STDOUT
+            )
         
         print(f"✅ C# API started with PID: {process.pid}")
         print("⏳ Waiting for API to be ready...")
         
         # Wait for API to start
-        max_attempts = 30
-        for attempt in range(max_attempts):
-            try:
-                response = requests.get("http://localhost:5000/health", timeout=2)
-                if response.status_code == 200:
-                    print("✅ C# API is ready!")
-                    return process
-            except:
-                pass
-            
-            print(f"   Attempt {attempt + 1}/{max_attempts}...")
-            time.sleep(2)
+        if asyncio.run(wait_ready("http://localhost:5000/health", 60)) is not None:
+            print("✅ C# API is ready!")
+            return process
         
         print("❌ C# API failed to start within timeout")
         process.terminate()
@@ -117,4 +111,5 @@ def test_and_run():
             process.wait()
 
 if __name__ == "__main__":
+    use_fast_event_loop()
     test_and_run()
\ No newline at end of file
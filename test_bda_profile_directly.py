@@ -3,10 +3,211 @@
 Test BDA profile ARNs directly to find the working one
 """
 
+import asyncio
 import boto3
-import time
+import functools
+import itertools
+import re
+import sys
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from botocore.config import Config
 from botocore.exceptions import ClientError
 
+try:
+    import aioboto3  # One event loop drives every probe instead of a thread each
+    from aiobotocore.config import AioConfig
+except ImportError:
+    aioboto3 = None
+
+from _bda_test_utils import ephemeral_bucket, upload_fixture
+
+# Pool sized above the concurrent profile probes so no socket is discarded mid-burst, with
+# keep-alive and client-side throttling backoff
+_CLIENT_CONFIG = Config(
+    max_pool_connections=50,
+    tcp_keepalive=True,
+    retries={'mode': 'adaptive', 'max_attempts': 3}
+)
+
+@functools.lru_cache(maxsize=None)
+def _client(service: str, region: str = 'us-east-1'):
+    """One client per service and region for the life of the script"""
+    return boto3.session.Session().client(service, region_name=region, config=_CLIENT_CONFIG)
+
+# Simple text content (not PDF to avoid format issues), encoded once
+_TEST_W2_BYTES = b"Employee Name: John Doe\nSSN: 123-45-6789\nWages: $50000"
+
+# Phrases that classify a ValidationException; the group name is the kind
+_VALIDATION_PHRASES = re.compile(r'(?P<format>regular expression pattern)|(?P<not_found>not found)', re.IGNORECASE)
+
+def _validation_kind(error_message):
+    """'format' for a malformed ARN, 'not_found' for an unknown profile, otherwise 'other'"""
+    match = _VALIDATION_PHRASES.search(error_message)
+    return match.lastgroup if match else 'other'
+
+# Runs of one character class; an ARN's family is its string with each run collapsed to one symbol
+_ARN_RUNS = re.compile(r'[A-Z]+|[a-z]+|[0-9]+')
+
+def _family_key(profile_arn):
+    """Structural signature of an ARN, e.g. 'default' and 'standard' names share one, 'service-default' does not"""
+    return _ARN_RUNS.sub(lambda m: 'A' if m.group().isupper() else 'a' if m.group().islower() else '0', profile_arn)
+
+def _by_family(profile_candidates):
+    """(number, profile_arn) pairs taking one candidate per family in turn, and the number of families"""
+    families = {}
+    for i, profile_arn in enumerate(profile_candidates, 1):
+        families.setdefault(_family_key(profile_arn), []).append((i, profile_arn))
+    ordered = [c for wave in itertools.zip_longest(*families.values()) for c in wave if c is not None]
+    return ordered, len(families)
+
+def _try_profile(client, profile_arn, input_s3_uri, output_s3_uri, project_arn):
+    """Start one BDA invocation with a candidate profile; returns (profile_arn, invocation_arn or None, error or None)"""
+    try:
+        response = client.invoke_data_automation_async(
+            inputConfiguration={
+                's3Uri': input_s3_uri
+            },
+            outputConfiguration={
+                's3Uri': output_s3_uri
+            },
+            dataAutomationConfiguration={
+                'dataAutomationProjectArn': project_arn
+            },
+            dataAutomationProfileArn=profile_arn
+        )
+        return profile_arn, response.get('invocationArn'), None
+    except ClientError as e:
+        return profile_arn, None, e
+
+async def _aprobe(client, profile_arn, input_s3_uri, output_s3_uri, project_arn):
+    """Coroutine form of _try_profile for an aioboto3 client"""
+    try:
+        response = await client.invoke_data_automation_async(
+            inputConfiguration={
+                's3Uri': input_s3_uri
+            },
+            outputConfiguration={
+                's3Uri': output_s3_uri
+            },
+            dataAutomationConfiguration={
+                'dataAutomationProjectArn': project_arn
+            },
+            dataAutomationProfileArn=profile_arn
+        )
+        return profile_arn, response.get('invocationArn'), None
+    except ClientError as e:
+        return profile_arn, None, e
+
+def _is_format_error(error):
+    """True if BDA rejected the ARN itself as malformed"""
+    return (error.response.get('Error', {}).get('Code', '') == 'ValidationException'
+            and _validation_kind(error.response.get('Error', {}).get('Message', '')) == 'format')
+
+def _report_failure(error):
+    """Print why a candidate was rejected"""
+    error_code = error.response.get('Error', {}).get('Code', '')
+    error_message = error.response.get('Error', {}).get('Message', '')
+    
+    if error_code == 'ValidationException':
+        kind = _validation_kind(error_message)
+        if kind == 'format':
+            print(f"❌ Invalid ARN format")
+        elif kind == 'not_found':
+            print(f"❌ Profile not found")
+        else:
+            print(f"❌ Validation error: {error_message}")
+    elif error_code == 'ResourceNotFoundException':
+        print(f"❌ Profile not found")
+    elif error_code == 'AccessDeniedException':
+        print(f"❌ Access denied")
+    else:
+        print(f"❌ Error: {error_code} - {error_message}")
+
+def _probe_with_threads(client, profile_candidates, probe_args):
+    """Probe candidates on a thread pool; returns (profile_arn, invocation_arn) for the first accepted one, or None"""
+    ordered, family_count = _by_family(profile_candidates)
+    dead_families = set()
+    
+    def probe(profile_arn):
+        family = _family_key(profile_arn)
+        if family in dead_families:
+            return None  # A sibling's format was rejected before this one was sent
+        result = _try_profile(client, profile_arn, *probe_args)
+        if result[2] is not None and _is_format_error(result[2]):
+            dead_families.add(family)
+        return result
+    
+    # One worker per family, so every family's first candidate goes out at once and its siblings queue behind
+    with ThreadPoolExecutor(max_workers=family_count) as executor:
+        futures = {executor.submit(probe, profile_arn): (i, profile_arn) for i, profile_arn in ordered}
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                i, profile_arn = futures[future]
+                if future.result() is None:
+                    print(f"\n⏭️  Skipped {i}: {profile_arn} (same ARN format already rejected)")
+                    continue
+                profile_arn, invocation_arn, error = future.result()
+                print(f"\n🔍 Tested {i}: {profile_arn}")
+                
+                if error is None:
+                    # Skip candidates that have not been sent yet
+                    for other in pending:
+                        other.cancel()
+                    return profile_arn, invocation_arn
+                
+                _report_failure(error)
+                if _is_format_error(error):
+                    # Queued siblings would be rejected the same way
+                    family = _family_key(profile_arn)
+                    skipped = {other for other in pending if _family_key(futures[other][1]) == family and other.cancel()}
+                    pending -= skipped
+                    for other in skipped:
+                        print(f"\n⏭️  Skipped {futures[other][0]}: {futures[other][1]} (same ARN format already rejected)")
+    return None
+
+async def _probe_with_coroutines(profile_candidates, probe_args, region):
+    """Probe candidates as coroutines on one aioboto3 client; same result as _probe_with_threads"""
+    ordered, family_count = _by_family(profile_candidates)
+    dead_families = set()
+    gate = asyncio.Semaphore(family_count)
+    config = AioConfig(max_pool_connections=50, retries={'mode': 'adaptive', 'max_attempts': 3})
+    async with aioboto3.Session().client('bedrock-data-automation-runtime', region_name=region, config=config) as client:
+        async def probe(profile_arn):
+            async with gate:
+                family = _family_key(profile_arn)
+                if family in dead_families:
+                    return None  # A sibling's format was rejected while this one waited
+                result = await _aprobe(client, profile_arn, *probe_args)
+                if result[2] is not None and _is_format_error(result[2]):
+                    dead_families.add(family)
+                return result
+        
+        tasks = {asyncio.create_task(probe(profile_arn)): (i, profile_arn) for i, profile_arn in ordered}
+        pending = set(tasks)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    i, profile_arn = tasks[task]
+                    if task.result() is None:
+                        print(f"\n⏭️  Skipped {i}: {profile_arn} (same ARN format already rejected)")
+                        continue
+                    profile_arn, invocation_arn, error = task.result()
+                    print(f"\n🔍 Tested {i}: {profile_arn}")
+                    
+                    if error is None:
+                        return profile_arn, invocation_arn
+                    
+                    _report_failure(error)
+            return None
+        finally:
+            # Probes still in flight are abandoned before the client closes
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
 def test_bda_profile_directly():
     """Test BDA profile ARNs directly with minimal setup"""
     
@@ -17,151 +218,106 @@ def test_bda_profile_directly():
     account_id = '624706593351'
     project_arn = "arn:aws:bedrock:us-east-1:624706593351:data-automation-project/a07a2d75b205"
     
-    # Initialize clients
-    bedrock_data_automation_runtime_client = boto3.client('bedrock-data-automation-runtime', region_name=region)
-    s3_client = boto3.client('s3', region_name=region)
-    
-    # Create simple test setup
-    test_bucket = f"bda-direct-test-{int(time.time())}"
+    # Initialize clients; the runtime client is shared by all concurrent probes
+    bedrock_data_automation_runtime_client = _client('bedrock-data-automation-runtime', region)
+    s3_client = _client('s3', region)
     
     try:
-        print(f"📦 Creating test bucket: {test_bucket}")
-        s3_client.create_bucket(Bucket=test_bucket)
+        with ephemeral_bucket(s3_client, "bda-direct-test") as (test_bucket, test_keys):
+            print(f"📦 Created test bucket: {test_bucket}")
         
-        # Upload simple text content (not PDF to avoid format issues)
-        test_content = "Employee Name: John Doe\nSSN: 123-45-6789\nWages: $50000"
-        test_key = "simple-w2.txt"
+            # Upload simple text content (not PDF to avoid format issues)
+            test_key = "simple-w2.txt"
         
-        s3_client.put_object(
-            Bucket=test_bucket,
-            Key=test_key,
-            Body=test_content.encode('utf-8'),
-            ContentType='text/plain'
-        )
+            upload_fixture(s3_client, test_bucket, test_keys, test_key, _TEST_W2_BYTES, 'text/plain')
         
-        input_s3_uri = f"s3://{test_bucket}/{test_key}"
-        output_s3_uri = f"s3://{test_bucket}/output/"
+            input_s3_uri = f"s3://{test_bucket}/{test_key}"
+            output_s3_uri = f"s3://{test_bucket}/output/"
         
-        print(f"📤 Test input: {input_s3_uri}")
-        print(f"📥 Test output: {output_s3_uri}")
+            print(f"📤 Test input: {input_s3_uri}")
+            print(f"📥 Test output: {output_s3_uri}")
         
-        # Test different profile ARN patterns
-        profile_candidates = [
-            # Standard patterns
-            f"arn:aws:bedrock:{region}:{account_id}:data-automation-profile/default",
-            f"arn:aws:bedrock:{region}:aws:data-automation-profile/default",
-            f"arn:aws:bedrock:{region}:{account_id}:data-automation-profile/standard",
+            # Test different profile ARN patterns
+            profile_candidates = [
+                # Standard patterns
+                f"arn:aws:bedrock:{region}:{account_id}:data-automation-profile/default",
+                f"arn:aws:bedrock:{region}:aws:data-automation-profile/default",
+                f"arn:aws:bedrock:{region}:{account_id}:data-automation-profile/standard",
             
-            # Project-based patterns
-            f"arn:aws:bedrock:{region}:{account_id}:data-automation-profile/a07a2d75b205",
+                # Project-based patterns
+                f"arn:aws:bedrock:{region}:{account_id}:data-automation-profile/a07a2d75b205",
             
-            # Service patterns
-            f"arn:aws:bedrock:{region}:{account_id}:data-automation-profile/service-default",
-            f"arn:aws:bedrock:{region}:{account_id}:data-automation-profile/bedrock-default",
+                # Service patterns
+                f"arn:aws:bedrock:{region}:{account_id}:data-automation-profile/service-default",
+                f"arn:aws:bedrock:{region}:{account_id}:data-automation-profile/bedrock-default",
             
-            # Alternative naming
-            f"arn:aws:bedrock:{region}:{account_id}:data-automation-profile/AmazonBedrockDataAutomationRole",
-        ]
+                # Alternative naming
+                f"arn:aws:bedrock:{region}:{account_id}:data-automation-profile/AmazonBedrockDataAutomationRole",
+            ]
         
-        print(f"\n🧪 Testing {len(profile_candidates)} profile ARN candidates...")
+            print(f"\n🧪 Testing {len(profile_candidates)} profile ARN candidates...")
         
-        for i, profile_arn in enumerate(profile_candidates, 1):
-            print(f"\n🔍 Testing {i}: {profile_arn}")
+            # Each family's first candidate goes out together; a malformed-ARN rejection drops its unsent siblings
+            probe_args = (input_s3_uri, output_s3_uri, project_arn)
+            if aioboto3 is not None:
+                found = asyncio.run(_probe_with_coroutines(profile_candidates, probe_args, region))
+            else:
+                found = _probe_with_threads(bedrock_data_automation_runtime_client, profile_candidates, probe_args)
             
-            try:
-                response = bedrock_data_automation_runtime_client.invoke_data_automation_async(
-                    inputConfiguration={
-                        's3Uri': input_s3_uri
-                    },
-                    outputConfiguration={
-                        's3Uri': output_s3_uri
-                    },
-                    dataAutomationConfiguration={
-                        'dataAutomationProjectArn': project_arn
-                    },
-                    dataAutomationProfileArn=profile_arn
-                )
-                
-                invocation_arn = response.get('invocationArn')
+            if found is not None:
+                profile_arn, invocation_arn = found
                 print(f"✅ SUCCESS! Working profile ARN found!")
                 print(f"   Profile ARN: {profile_arn}")
                 print(f"   Invocation ARN: {invocation_arn}")
                 
-                # Clean up and return success
-                s3_client.delete_object(Bucket=test_bucket, Key=test_key)
-                s3_client.delete_bucket(Bucket=test_bucket)
-                
+                # Return success; the bucket is removed on the way out
                 return profile_arn
-                
-            except ClientError as e:
-                error_code = e.response.get('Error', {}).get('Code', '')
-                error_message = e.response.get('Error', {}).get('Message', '')
-                
-                if error_code == 'ValidationException':
-                    if 'regular expression pattern' in error_message:
-                        print(f"❌ Invalid ARN format")
-                    else:
-                        print(f"❌ Validation error: {error_message}")
-                elif error_code == 'ResourceNotFoundException':
-                    print(f"❌ Profile not found")
-                elif error_code == 'AccessDeniedException':
-                    print(f"❌ Access denied")
-                else:
-                    print(f"❌ Error: {error_code} - {error_message}")
-        
-        # If no profiles work, the issue might be that profiles need to be created first
-        print(f"\n❌ No working profile ARN found")
-        print(f"🔍 Checking if profiles need to be created...")
         
-        # Check AWS Console guidance
-        print(f"\n📋 NEXT STEPS:")
-        print(f"1. Go to AWS Console → Amazon Bedrock → Data Automation")
-        print(f"2. Look for 'Profiles' or 'Configuration' section")
-        print(f"3. Create a profile if the option exists")
-        print(f"4. Note the exact ARN format that gets created")
+            # If no profiles work, the issue might be that profiles need to be created first
+            print(f"\n❌ No working profile ARN found")
+            print(f"🔍 Checking if profiles need to be created...")
         
-        # Clean up
-        s3_client.delete_object(Bucket=test_bucket, Key=test_key)
-        s3_client.delete_bucket(Bucket=test_bucket)
+            # Check AWS Console guidance
+            sys.stdout.write("\n".join([
+                "\n📋 NEXT STEPS:",
+                "1. Go to AWS Console → Amazon Bedrock → Data Automation",
+                "2. Look for 'Profiles' or 'Configuration' section",
+                "3. Create a profile if the option exists",
+                "4. Note the exact ARN format that gets created",
+            ]) + "\n")
         
-        return None
+            return None
         
     except Exception as e:
         print(f"❌ Test setup failed: {str(e)}")
-        
-        # Clean up on error
-        try:
-            s3_client.delete_object(Bucket=test_bucket, Key=test_key)
-            s3_client.delete_bucket(Bucket=test_bucket)
-        except:
-            pass
-        
         return None
 
 def check_console_guidance():
     """Provide guidance for checking AWS Console"""
     
-    print(f"\n🔧 AWS CONSOLE CHECK REQUIRED")
-    print("=" * 40)
-    
-    print(f"Since no profile ARNs work, you need to:")
-    print(f"")
-    print(f"1. Open AWS Console → Amazon Bedrock → Data Automation")
-    print(f"2. Look for one of these sections:")
-    print(f"   - Profiles")
-    print(f"   - Configuration")
-    print(f"   - Settings")
-    print(f"   - Project Settings")
-    print(f"")
-    print(f"3. If you see a 'Create Profile' option:")
-    print(f"   - Create a profile named 'default'")
-    print(f"   - Copy the exact ARN that gets generated")
-    print(f"")
-    print(f"4. If you don't see profile options:")
-    print(f"   - BDA profiles might not be available in your region")
-    print(f"   - Contact AWS support about BDA profile setup")
-    print(f"")
-    print(f"5. Alternative: Check if your BDA project has embedded profile info")
+    sys.stdout.write("\n".join([
+        "\n🔧 AWS CONSOLE CHECK REQUIRED",
+        "=" * 40,
+        "",
+        "Since no profile ARNs work, you need to:",
+        "",
+        "1. Open AWS Console → Amazon Bedrock → Data Automation",
+        "2. Look for one of these sections:",
+        "   - Profiles",
+        "   - Configuration",
+        "   - Settings",
+        "   - Project Settings",
+        "",
+        "3. If you see a 'Create Profile' option:",
+        "   - Create a profile named 'default'",
+        "   - Copy the exact ARN that gets generated",
+        "",
+        "4. If you don't see profile options:",
+        "   - BDA profiles might not be available in your region",
+        "   - Contact AWS support about BDA profile setup",
+        "",
+        "5. Alternative: Check if your BDA project has embedded profile info",
+    ]) + "\n")
 
 def main():
     working_profile = test_bda_profile_directly()
@@ -7,8 +7,29 @@ This tests the C# version on port 5000 to ensure it matches Python functionality
 import requests
 import json
 import os
+import sys
 import time
 
+try:
+    from requests_toolbelt import MultipartEncoder  # Streams the multipart body from the open file
+except ImportError:
+    MultipartEncoder = None
+
+try:
+    import orjson  # Faster decoding of the API responses
+except ImportError:
+    orjson = None
+
+# One keep-alive connection pool for every request the script makes
+SESSION = requests.Session()
+SESSION.mount('http://', requests.adapters.HTTPAdapter(pool_connections=2, pool_maxsize=4))
+
+def loads_json(data: bytes):
+    """Parse a JSON response body, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
 def test_csharp_bda_project():
     """Test C# BDA implementation"""
     
@@ -22,9 +43,9 @@ def test_csharp_bda_project():
     # Step 1: Check API
     print("1️⃣ Checking C# API...")
     try:
-        health_response = requests.get(f"{API_URL}/health", timeout=5)
+        health_response = SESSION.get(f"{API_URL}/health", timeout=5)
         if health_response.status_code == 200:
-            health_data = health_response.json()
+            health_data = loads_json(health_response.content)
             print(f"✅ C# API running: {health_data.get('Message', 'Healthy')}")
             print(f"📋 Version: {health_data.get('Version', 'Unknown')}")
             print(f"🔷 Language: {health_data.get('Language', 'Unknown')}")
@@ -32,41 +53,50 @@ def test_csharp_bda_project():
             print("❌ C# API not responding correctly")
             return False
     except Exception as e:
-        print(f"❌ Cannot connect to C# API: {e}")
-        print("💡 Start the C# API using your GUI manager:")
-        print("   1. Click '▶️ Start C# W-2 Processor' in GUI")
-        print("   2. Wait for green dot 🟢 on port 5000")
-        print("   3. Run this test again")
+        sys.stdout.write("\n".join([
+            f"❌ Cannot connect to C# API: {e}",
+            "💡 Start the C# API using your GUI manager:",
+            "   1. Click '▶️ Start C# W-2 Processor' in GUI",
+            "   2. Wait for green dot 🟢 on port 5000",
+            "   3. Run this test again",
+        ]) + "\n")
         return False
     
     # Step 2: Check W-2 file
     print(f"\n2️⃣ Checking W-2 file...")
-    if not os.path.exists(W2_FILE):
+    # One stat answers both whether the file exists and how big it is
+    try:
+        file_size = os.stat(W2_FILE).st_size
+    except FileNotFoundError:
         print(f"❌ W-2 file not found: {W2_FILE}")
         return False
     
-    file_size = os.path.getsize(W2_FILE)
     print(f"✅ W-2 file found ({file_size:,} bytes)")
     
     # Step 3: Get existing BDA projects
     print("\n3️⃣ Finding real BDA projects...")
     try:
-        projects_response = requests.get(f"{API_URL}/blueprint/projects")
+        # The API filters to real BDA projects (not fallback Textract), newest first
+        projects_response = SESSION.get(f"{API_URL}/blueprint/projects", params={'service': 'bda'})
         if projects_response.status_code != 200:
             print("❌ Failed to get projects from C# API")
             return False
         
-        projects_data = projects_response.json()
+        projects_data = loads_json(projects_response.content)
         projects = projects_data.get('Projects', [])
         
-        # Find real BDA projects (not fallback Textract)
-        real_bda_projects = []
-        for project in projects:
-            service = project.get('Service', '')
-            project_arn = project.get('ProjectArn', '')
-            
-            if 'Amazon Bedrock Data Automation' in service and 'bedrock' in project_arn.lower():
-                real_bda_projects.append(project)
+        # ASP.NET serialises property names in camelCase unless configured otherwise
+        if (projects_data.get('Filter') or projects_data.get('filter')) == 'bda':
+            real_bda_projects = projects
+        else:
+            # Older API builds ignore the query string; apply the server's filter and order here
+            real_bda_projects = sorted(
+                (project for project in projects
+                 if project.get('ProcessingMode') == 'BDA'
+                 and ':data-automation-project/' in project.get('ProjectArn', '')),
+                key=lambda project: project.get('CreatedAt', 0),
+                reverse=True
+            )
         
         if not real_bda_projects:
             print("❌ No real BDA projects found in C# API")
@@ -96,24 +126,33 @@ def test_csharp_bda_project():
     try:
         with open(W2_FILE, 'rb') as f:
             files = {'file': ('w-2.pdf', f, 'application/pdf')}
+            upload_url = f"{API_URL}/blueprint/project/{project_name}/upload"
             
-            upload_response = requests.post(
-                f"{API_URL}/blueprint/project/{project_name}/upload",
-                files=files
-            )
+            if MultipartEncoder is not None:
+                # Sent in chunks as it is read, rather than built in memory first
+                body = MultipartEncoder(fields=files)
+                upload_response = SESSION.post(
+                    upload_url,
+                    data=body,
+                    headers={'Content-Type': body.content_type}
+                )
+            else:
+                upload_response = SESSION.post(upload_url, files=files)
         
         if upload_response.status_code == 200:
-            upload_data = upload_response.json()
+            upload_data = loads_json(upload_response.content)
             print("✅ W-2 uploaded successfully to C# API!")
             
             # Check for BDA processing job (this indicates the C# fix worked)
             if 'InvocationArn' in upload_data and upload_data['InvocationArn']:
-                print("\n🎉 SUCCESS: C# BDA PROCESSING JOB CREATED!")
-                print(f"📋 Invocation ARN: {upload_data['InvocationArn']}")
-                print("✅ The C# dataAutomationProfileArn fix is WORKING!")
-                print(f"📍 Project: {project_name}")
-                print("🌐 Check AWS Console → Amazon Bedrock → Data Automation → Projects")
-                print(f"🔷 Language: {upload_data.get('Language', 'C#')}")
+                sys.stdout.write("\n".join([
+                    "\n🎉 SUCCESS: C# BDA PROCESSING JOB CREATED!",
+                    f"📋 Invocation ARN: {upload_data['InvocationArn']}",
+                    "✅ The C# dataAutomationProfileArn fix is WORKING!",
+                    f"📍 Project: {project_name}",
+                    "🌐 Check AWS Console → Amazon Bedrock → Data Automation → Projects",
+                    f"🔷 Language: {upload_data.get('Language', 'C#')}",
+                ]) + "\n")
                 
                 # Show additional details
                 if 'S3Uri' in upload_data:
@@ -143,7 +182,7 @@ def test_csharp_bda_project():
         else:
             print(f"❌ Upload failed: {upload_response.status_code}")
             try:
-                error_data = upload_response.json()
+                error_data = loads_json(upload_response.content)
                 print(f"Error: {error_data.get('Detail', 'Unknown error')}")
             except:
                 print(f"Error response: {upload_response.text}")
@@ -169,9 +208,9 @@ def compare_python_and_csharp():
     
     for name, url in apis:
         try:
-            response = requests.get(f"{url}/health", timeout=3)
+            response = SESSION.get(f"{url}/health", timeout=3)
             if response.status_code == 200:
-                data = response.json()
+                data = loads_json(response.content)
                 print(f"{name}: ✅ {data.get('Message', 'Running')}")
             else:
                 print(f"{name}: ❌ Not responding")
@@ -188,16 +227,20 @@ def main():
     
     print("\n" + "=" * 60)
     if success:
-        print("🎉 C# TEST PASSED!")
-        print("✅ The C# dataAutomationProfileArn fix is working correctly!")
-        print("✅ C# BDA processing job created successfully!")
-        print("✅ C# implementation matches Python functionality!")
-        print("📍 Check AWS Console for processing results")
+        sys.stdout.write("\n".join([
+            "🎉 C# TEST PASSED!",
+            "✅ The C# dataAutomationProfileArn fix is working correctly!",
+            "✅ C# BDA processing job created successfully!",
+            "✅ C# implementation matches Python functionality!",
+            "📍 Check AWS Console for processing results",
+        ]) + "\n")
     else:
-        print("❌ C# TEST FAILED!")
-        print("🔧 The C# dataAutomationProfileArn implementation needs work")
-        print("💡 Check C# API server logs for detailed error messages")
-        print("🔄 Ensure C# implementation matches Python BDA logic")
+        sys.stdout.write("\n".join([
+            "❌ C# TEST FAILED!",
+            "🔧 The C# dataAutomationProfileArn implementation needs work",
+            "💡 Check C# API server logs for detailed error messages",
+            "🔄 Ensure C# implementation matches Python BDA logic",
+        ]) + "\n")
     
     # Compare both APIs
     compare_python_and_csharp()